@@ -8,3 +8,6 @@ class Iso14242Config(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "ISO14242"
     verbose_name = _("مدیریت دارایی‌های ISO 14224")
+
+    def ready(self) -> None:
+        from . import signals  # noqa: F401
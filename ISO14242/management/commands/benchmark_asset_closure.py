@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import time
+from typing import Callable, Iterable, List
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+from django.db.models import Count, Func, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Concat
+
+from ... import services
+from ...models import Asset
+
+SHAPES = {
+    # name: fan-out per level below the benchmark root
+    "deep": [2, 2, 2, 2, 2, 2, 2, 2],
+    "wide": [20, 20, 2],
+}
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "مقایسه پرس‌وجوهای سلسله‌مراتبی مبتنی بر path با جدول AssetClosure."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--shape", choices=sorted(SHAPES), action="append")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options) -> None:
+        for shape in options["shape"] or sorted(SHAPES):
+            try:
+                with transaction.atomic():
+                    self._run_shape(shape, options["repeat"])
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    def _run_shape(self, shape: str, repeat: int) -> None:
+        # The synthetic tree hangs off its own root so existing assets are
+        # left out of the timings; the surrounding transaction is rolled back.
+        root = Asset.objects.create(name=f"benchmark-{shape}")
+        count = _build_tree(root, SHAPES[shape])
+        started = time.perf_counter()
+        services.rebuild_branch(root)
+        rebuild = time.perf_counter() - started
+        self.stdout.write(f"{shape}: {count} assets, rebuild_branch {rebuild * 1000:.1f} ms")
+
+        root.refresh_from_db(fields=["path", "level"])
+        subtree = Asset.objects.filter(
+            Q(pk=root.pk) | Q(path__startswith=f"{root.path}{services.SEGMENT_SEPARATOR}")
+        )
+        leaf = subtree.order_by("-level", "path").first()
+        cases = [
+            (
+                "descendants",
+                lambda: list(root.get_descendants()),
+                lambda: list(Asset.objects.descendants_of(root)),
+            ),
+            (
+                "ancestors",
+                lambda: list(Asset.objects.filter(path__in=_ancestor_paths(leaf))),
+                lambda: list(Asset.objects.ancestors_of(leaf)),
+            ),
+            (
+                "rollup",
+                lambda: list(_path_rollup(subtree)),
+                lambda: list(
+                    Asset.objects.descendants_of(root, include_self=True).with_rollup(
+                        include_self=False, total=Count("pk")
+                    )
+                ),
+            ),
+        ]
+        for label, by_path, by_closure in cases:
+            self.stdout.write(
+                f"  {label:<12} path {_best(by_path, repeat):8.2f} ms"
+                f"  closure {_best(by_closure, repeat):8.2f} ms"
+            )
+
+
+def _build_tree(root: Asset, fanout: List[int]) -> int:
+    level_nodes: Iterable[Asset] = [root]
+    count = 1
+    for level, width in enumerate(fanout, start=root.level + 1):
+        batch = [
+            Asset(name=f"L{level}-{count + offset}", parent=parent, level=level)
+            for offset, parent in enumerate(
+                parent for parent in level_nodes for _ in range(width)
+            )
+        ]
+        Asset.objects.bulk_create(batch)
+        count += len(batch)
+        level_nodes = batch
+    return count
+
+
+def _ancestor_paths(asset: Asset) -> List[str]:
+    segments = asset.path.split(services.SEGMENT_SEPARATOR)
+    return [services.SEGMENT_SEPARATOR.join(segments[:end]) for end in range(1, len(segments))]
+
+
+def _path_rollup(queryset):
+    subtree = (
+        Asset.objects.filter(path__startswith=Concat(OuterRef("path"), Value(services.SEGMENT_SEPARATOR)))
+        .order_by()
+        .annotate(total=Func("pk", function="COUNT", output_field=IntegerField()))
+        .values("total")
+    )
+    return queryset.annotate(total=Subquery(subtree))
+
+
+def _best(query: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(max(repeat, 1)):
+        started = time.perf_counter()
+        query()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
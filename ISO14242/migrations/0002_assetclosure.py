@@ -0,0 +1,102 @@
+# Generated manually for ISO14242 AssetClosure model
+from __future__ import annotations
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_closure(apps, schema_editor):
+    # Frozen copy of services.populate_closure for the whole tree.
+    Asset = apps.get_model("ISO14242", "Asset")
+    AssetClosure = apps.get_model("ISO14242", "AssetClosure")
+    connection = schema_editor.connection
+    qn = connection.ops.quote_name
+
+    def column(model, name):
+        return qn(model._meta.get_field(name).column)
+
+    asset_table = qn(Asset._meta.db_table)
+    closure_table = qn(AssetClosure._meta.db_table)
+    asset_id = column(Asset, "id")
+    ancestor = column(AssetClosure, "ancestor")
+    descendant = column(AssetClosure, "descendant")
+    depth = column(AssetClosure, "depth")
+
+    AssetClosure.objects.using(connection.alias).all().delete()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {closure_table} ({ancestor}, {descendant}, {depth}) "
+            f"SELECT a.{asset_id}, a.{asset_id}, 0 FROM {asset_table} a"
+        )
+        level = 2
+        while True:
+            cursor.execute(
+                f"INSERT INTO {closure_table} ({ancestor}, {descendant}, {depth}) "
+                f"SELECT c.{ancestor}, a.{asset_id}, c.{depth} + 1 FROM {asset_table} a "
+                f"JOIN {closure_table} c ON c.{descendant} = a.{column(Asset, 'parent')} "
+                f"WHERE a.{column(Asset, 'level')} = %s",
+                [level],
+            )
+            if cursor.rowcount == 0:
+                break
+            level += 1
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ISO14242", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AssetClosure",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("depth", models.PositiveSmallIntegerField(verbose_name="فاصله")),
+                (
+                    "ancestor",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="descendant_links",
+                        to="ISO14242.asset",
+                        verbose_name="بالادستی",
+                    ),
+                ),
+                (
+                    "descendant",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ancestor_links",
+                        to="ISO14242.asset",
+                        verbose_name="پایین‌دستی",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "رابطه درختی",
+                "verbose_name_plural": "روابط درختی",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="assetclosure",
+            constraint=models.UniqueConstraint(
+                fields=("ancestor", "descendant"),
+                name="asset_closure_unique_pair",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="assetclosure",
+            index=models.Index(fields=["descendant", "depth"], name="asset_closure_desc_depth"),
+        ),
+        migrations.RunPython(populate_closure, migrations.RunPython.noop),
+    ]
@@ -1,16 +1,83 @@
 from __future__ import annotations
 
 import uuid
-from typing import List
+from typing import Any, List
 
-from django.core.exceptions import ValidationError
+from django.core.exceptions import ImproperlyConfigured, ValidationError
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
 from . import services
 
 
+class AssetQuerySet(models.QuerySet["Asset"]):
+    """Hierarchy lookups that join through ``AssetClosure`` instead of ``path`` prefixes."""
+
+    def _require_closure(self) -> None:
+        if not services.closure_enabled():
+            raise ImproperlyConfigured(
+                "ISO14242_ASSET_CLOSURE is disabled; use the path-based Asset "
+                "methods (get_ancestors, get_descendants) instead."
+            )
+
+    def ancestors_of(self, asset: "Asset", include_self: bool = False) -> "AssetQuerySet":
+        self._require_closure()
+        min_depth = 0 if include_self else 1
+        return self.filter(
+            descendant_links__descendant=asset,
+            descendant_links__depth__gte=min_depth,
+        ).order_by("path")
+
+    def descendants_of(
+        self,
+        asset: "Asset",
+        include_self: bool = False,
+        max_depth: int | None = None,
+    ) -> "AssetQuerySet":
+        self._require_closure()
+        min_depth = 0 if include_self else 1
+        lookups: dict[str, Any] = {
+            "ancestor_links__ancestor": asset,
+            "ancestor_links__depth__gte": min_depth,
+        }
+        if max_depth is not None:
+            lookups["ancestor_links__depth__lte"] = max_depth
+        return self.filter(**lookups).order_by("path")
+
+    def with_rollup(self, include_self: bool = True, **aggregates: Any) -> "AssetQuerySet":
+        """Annotate each asset with aggregates computed over its whole subtree.
+
+        Aggregate expressions are written relative to the descendant asset, e.g.
+        ``with_rollup(total=Count("children"))``; each one becomes a correlated
+        subquery joined on ``AssetClosure.ancestor``. Empty subtrees fall back to
+        the aggregate's ``default`` or its empty-set value (``0`` for ``Count``).
+        """
+        self._require_closure()
+        min_depth = 0 if include_self else 1
+        annotations = {}
+        for alias, aggregate in aggregates.items():
+            subtree = (
+                Asset.objects.filter(
+                    ancestor_links__ancestor=models.OuterRef("pk"),
+                    ancestor_links__depth__gte=min_depth,
+                )
+                .order_by()
+                .values("ancestor_links__ancestor")
+                .annotate(rollup_value=aggregate)
+                .values("rollup_value")
+            )
+            rollup = models.Subquery(subtree)
+            default = aggregate.default
+            if default is None:
+                default = aggregate.empty_result_set_value
+            if default is not None:
+                rollup = Coalesce(rollup, default, output_field=rollup.output_field)
+            annotations[alias] = rollup
+        return self.annotate(**annotations)
+
+
 class Asset(models.Model):
     """Asset model representing ISO 14224 hierarchical elements."""
 
@@ -49,6 +116,8 @@ class Asset(models.Model):
     )
     meta = models.JSONField(blank=True, null=True, verbose_name=_("اطلاعات تکمیلی"))
 
+    objects = AssetQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("تجهیز")
         verbose_name_plural = _("تجهیزات")
@@ -132,3 +201,39 @@ class Asset(models.Model):
         return self.children.count()
 
     children_count.short_description = _("تعداد زیرمجموعه")
+
+
+class AssetClosure(models.Model):
+    """One row per (ancestor, descendant) pair, including each asset with itself at depth 0."""
+
+    ancestor = models.ForeignKey(
+        Asset,
+        on_delete=models.CASCADE,
+        related_name="descendant_links",
+        db_index=False,
+        verbose_name=_("بالادستی"),
+    )
+    descendant = models.ForeignKey(
+        Asset,
+        on_delete=models.CASCADE,
+        related_name="ancestor_links",
+        db_index=False,
+        verbose_name=_("پایین‌دستی"),
+    )
+    depth = models.PositiveSmallIntegerField(verbose_name=_("فاصله"))
+
+    class Meta:
+        verbose_name = _("رابطه درختی")
+        verbose_name_plural = _("روابط درختی")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["ancestor", "descendant"],
+                name="asset_closure_unique_pair",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["descendant", "depth"], name="asset_closure_desc_depth"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.ancestor_id} -> {self.descendant_id} ({self.depth})"
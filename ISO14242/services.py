@@ -3,8 +3,10 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Optional
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.db import connections, router, transaction
+from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 
 SEGMENT_WIDTH = 4
@@ -20,6 +22,113 @@ def _format_segment(index: int) -> str:
     return f"{index:0{SEGMENT_WIDTH}d}"
 
 
+def closure_enabled() -> bool:
+    return getattr(settings, "ISO14242_ASSET_CLOSURE", True)
+
+
+def populate_closure(parent: Optional["Asset"] = None, include_self: bool = False) -> int:
+    """Rebuild closure rows for the subtree below ``parent`` (whole tree if ``None``).
+
+    Rows are regenerated level by level with ``INSERT ... SELECT`` until a level
+    comes back empty, so the cost is one statement per tree level rather than
+    one per node. ``parent`` must have an up-to-date ``path`` and closure rows
+    of its own, unless ``include_self`` asks for those to be rebuilt as well.
+    """
+    from .models import Asset, AssetClosure
+
+    using = router.db_for_write(AssetClosure)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+
+    def column(model, name: str) -> str:
+        return qn(model._meta.get_field(name).column)
+
+    asset_table = qn(Asset._meta.db_table)
+    closure_table = qn(AssetClosure._meta.db_table)
+    asset_id = column(Asset, "id")
+    asset_parent = column(Asset, "parent")
+    asset_level = column(Asset, "level")
+    asset_path = column(Asset, "path")
+    ancestor = column(AssetClosure, "ancestor")
+    descendant = column(AssetClosure, "descendant")
+    depth = column(AssetClosure, "depth")
+    subtree = Asset.objects.using(using)
+    path_filter = ""
+    params: list[object] = []
+    level = 2
+    if parent is not None:
+        prefix = f"{parent.path}{SEGMENT_SEPARATOR}"
+        if include_self:
+            subtree = subtree.filter(Q(path=parent.path) | Q(path__startswith=prefix))
+            path_filter = f"AND (a.{asset_path} = %s OR a.{asset_path} LIKE %s)"
+            params = [parent.path, f"{prefix}%"]
+            level = max(parent.level, 2)
+        else:
+            subtree = subtree.filter(path__startswith=prefix)
+            path_filter = f"AND a.{asset_path} LIKE %s"
+            params = [f"{prefix}%"]
+            level = parent.level + 1
+
+    AssetClosure.objects.using(using).filter(descendant__in=subtree.values("pk")).delete()
+    inserted = 0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {closure_table} ({ancestor}, {descendant}, {depth}) "
+            f"SELECT a.{asset_id}, a.{asset_id}, 0 FROM {asset_table} a "
+            f"WHERE 1 = 1 {path_filter}",
+            params,
+        )
+        inserted += cursor.rowcount
+        while True:
+            cursor.execute(
+                f"INSERT INTO {closure_table} ({ancestor}, {descendant}, {depth}) "
+                f"SELECT c.{ancestor}, a.{asset_id}, c.{depth} + 1 FROM {asset_table} a "
+                f"JOIN {closure_table} c ON c.{descendant} = a.{asset_parent} "
+                f"WHERE a.{asset_level} = %s {path_filter}",
+                [level, *params],
+            )
+            if cursor.rowcount == 0:
+                break
+            inserted += cursor.rowcount
+            level += 1
+    return inserted
+
+
+def rebuild_closure(parent: Optional["Asset"] = None) -> int:
+    if not closure_enabled():
+        return 0
+    if parent is not None and not _closure_matches_ancestors(parent):
+        # Rows above the branch are missing or stale (e.g. written while the
+        # closure was disabled), so an incremental rebuild would inherit them.
+        parent = None
+    return populate_closure(parent)
+
+
+def rebuild_node_closure(asset: "Asset") -> int:
+    """Rebuild closure rows for ``asset`` and everything below it.
+
+    Used for fixture rows, which arrive in arbitrary order: rows whose parent
+    is not loaded yet are completed when the parent itself is saved.
+    """
+    if not closure_enabled():
+        return 0
+    return populate_closure(asset, include_self=True)
+
+
+def _closure_matches_ancestors(asset: "Asset") -> bool:
+    from .models import AssetClosure
+
+    # Paths are maintained regardless of the closure setting, so the ancestor
+    # at depth d must own ``asset.path`` with its last d segments removed.
+    segments = asset.path.split(SEGMENT_SEPARATOR)
+    expected = {
+        (SEGMENT_SEPARATOR.join(segments[: len(segments) - depth]), depth)
+        for depth in range(asset.level)
+    }
+    stored = AssetClosure.objects.filter(descendant=asset).values_list("ancestor__path", "depth")
+    return set(stored) == expected
+
+
 def compute_level(parent: Optional["Asset"]) -> int:
     return 1 if parent is None else parent.level + 1
 
@@ -68,6 +177,7 @@ def rebuild_branch(parent: Optional["Asset"]) -> RebuildStats:
             siblings = list(parent.children.all().order_by("name", "code", "pk"))
             for index, node in enumerate(siblings, start=1):
                 apply(node, index, parent)
+        rebuild_closure(parent)
     return stats
 
 
@@ -110,4 +220,5 @@ def rebuild_descendants(root: "Asset") -> RebuildStats:
                 "parent": _("زیرشاخه برای ریشه موجود نیست."),
             })
         apply(root, parent)
+        rebuild_closure(parent)
     return stats
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from . import services
+from .models import Asset
+
+
+@receiver(post_save, sender=Asset)
+def sync_closure_for_raw_save(sender, instance: Asset, raw: bool = False, **kwargs) -> None:
+    """``loaddata`` saves with ``raw=True`` and skips ``Asset.save``, so sync here."""
+    if raw:
+        services.rebuild_node_closure(instance)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db.models import Count, Max
+
+from ISO14242 import services
+from ISO14242.models import Asset, AssetClosure
+
+
+def _closure_pairs() -> set[tuple[str, str, int]]:
+    return {
+        (row.ancestor.name, row.descendant.name, row.depth)
+        for row in AssetClosure.objects.select_related("ancestor", "descendant")
+    }
+
+
+def _expected_pairs() -> set[tuple[str, str, int]]:
+    pairs = set()
+    for asset in Asset.objects.all():
+        chain = asset.get_ancestors() + [asset]
+        for depth, ancestor in enumerate(reversed(chain)):
+            pairs.add((ancestor.name, asset.name, depth))
+    return pairs
+
+
+@pytest.mark.django_db
+def test_closure_tracks_creation_and_moves() -> None:
+    root_a = Asset.objects.create(name="ریشه الف")
+    root_b = Asset.objects.create(name="ریشه ب")
+    child = Asset.objects.create(name="فرزند", parent=root_a)
+    Asset.objects.create(name="نوه", parent=child)
+    assert _closure_pairs() == _expected_pairs()
+
+    child.parent = root_b
+    child.save()
+    assert _closure_pairs() == _expected_pairs()
+    assert ("ریشه الف", "نوه", 2) not in _closure_pairs()
+
+    child.delete()
+    assert _closure_pairs() == _expected_pairs()
+
+
+@pytest.mark.django_db
+def test_rebuild_full_tree_restores_closure() -> None:
+    parent = None
+    for idx in range(1, 5):
+        parent = Asset.objects.create(name=f"گره {idx}", parent=parent)
+    expected = _expected_pairs()
+    AssetClosure.objects.all().delete()
+
+    services.rebuild_full_tree()
+    assert _closure_pairs() == expected
+
+
+@pytest.mark.django_db
+def test_ancestor_and_descendant_helpers() -> None:
+    root = Asset.objects.create(name="ریشه")
+    child = Asset.objects.create(name="فرزند", parent=root)
+    grand = Asset.objects.create(name="نوه", parent=child)
+
+    assert list(Asset.objects.ancestors_of(grand)) == [root, child]
+    assert list(Asset.objects.ancestors_of(grand, include_self=True)) == [root, child, grand]
+    assert list(Asset.objects.descendants_of(root)) == list(root.get_descendants())
+    assert list(Asset.objects.descendants_of(root, max_depth=1)) == [child]
+
+
+@pytest.mark.django_db
+def test_with_rollup_aggregates_over_subtree() -> None:
+    root = Asset.objects.create(name="ریشه")
+    child = Asset.objects.create(name="فرزند", parent=root)
+    Asset.objects.create(name="نوه ۱", parent=child)
+    Asset.objects.create(name="نوه ۲", parent=child)
+
+    rollup = {
+        asset.name: asset.subtree_size
+        for asset in Asset.objects.with_rollup(subtree_size=Count("pk"))
+    }
+    assert rollup == {"ریشه": 4, "فرزند": 3, "نوه ۱": 1, "نوه ۲": 1}
+
+    below = {
+        asset.name: asset.below
+        for asset in Asset.objects.with_rollup(include_self=False, below=Count("pk"))
+    }
+    assert below == {"ریشه": 3, "فرزند": 2, "نوه ۱": 0, "نوه ۲": 0}
+
+    leaf = Asset.objects.with_rollup(
+        include_self=False, deepest=Max("level"), floor=Max("level", default=-1)
+    ).get(name="نوه ۱")
+    assert leaf.deepest is None
+    assert leaf.floor == -1
+
+
+@pytest.mark.django_db
+def test_closure_can_be_disabled(settings) -> None:
+    settings.ISO14242_ASSET_CLOSURE = False
+    root = Asset.objects.create(name="ریشه")
+    assert not AssetClosure.objects.exists()
+    with pytest.raises(ImproperlyConfigured):
+        Asset.objects.descendants_of(root)
+    with pytest.raises(ImproperlyConfigured):
+        Asset.objects.ancestors_of(root)
+    with pytest.raises(ImproperlyConfigured):
+        Asset.objects.with_rollup(total=Count("pk"))
+
+
+@pytest.mark.django_db
+def test_closure_resyncs_after_being_re_enabled(settings) -> None:
+    settings.ISO14242_ASSET_CLOSURE = False
+    root = Asset.objects.create(name="ریشه")
+    child = Asset.objects.create(name="فرزند", parent=root)
+    settings.ISO14242_ASSET_CLOSURE = True
+
+    Asset.objects.create(name="نوه", parent=child)
+    assert _closure_pairs() == _expected_pairs()
+
+
+@pytest.mark.django_db
+def test_closure_resyncs_after_move_while_disabled(settings) -> None:
+    root_a = Asset.objects.create(name="ریشه الف")
+    root_b = Asset.objects.create(name="ریشه ب")
+    child = Asset.objects.create(name="فرزند", parent=root_a)
+    grand = Asset.objects.create(name="نوه", parent=child)
+    settings.ISO14242_ASSET_CLOSURE = False
+    child.parent = root_b
+    child.save()
+    settings.ISO14242_ASSET_CLOSURE = True
+
+    Asset.objects.create(name="نتیجه", parent=grand)
+    assert _closure_pairs() == _expected_pairs()
+
+
+@pytest.mark.django_db
+def test_closure_check_uses_single_query(django_assert_num_queries) -> None:
+    root = Asset.objects.create(name="ریشه")
+    child = Asset.objects.create(name="فرزند", parent=root)
+    grand = Asset.objects.create(name="نوه", parent=child)
+
+    with django_assert_num_queries(1):
+        assert services._closure_matches_ancestors(grand)
+
+
+@pytest.mark.django_db
+def test_seed_fixture_populates_closure() -> None:
+    call_command("loaddata", "seed_assets", verbosity=0)
+
+    assert _closure_pairs() == _expected_pairs()
+    for root in Asset.objects.filter(parent__isnull=True):
+        assert list(Asset.objects.descendants_of(root)) == list(root.get_descendants())
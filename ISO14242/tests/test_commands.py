@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from ISO14242.models import Asset
+
+
+@pytest.mark.django_db
+def test_benchmark_asset_closure_reports_cases_and_rolls_back() -> None:
+    out = StringIO()
+    call_command("benchmark_asset_closure", shape=["wide"], repeat=1, stdout=out)
+
+    output = out.getvalue()
+    for label in ("descendants", "ancestors", "rollup"):
+        assert label in output
+    assert not Asset.objects.exists()
+
+
+@pytest.mark.django_db
+def test_benchmark_asset_closure_runs_alongside_existing_assets() -> None:
+    call_command("loaddata", "seed_assets", verbosity=0)
+    before = set(Asset.objects.values_list("pk", "path", "level"))
+    out = StringIO()
+    call_command("benchmark_asset_closure", shape=["deep"], repeat=1, stdout=out)
+
+    output = out.getvalue()
+    for label in ("descendants", "ancestors", "rollup"):
+        assert label in output
+    assert set(Asset.objects.values_list("pk", "path", "level")) == before
@@ -84,3 +84,8 @@ USE_TZ = True
 STATIC_URL = "static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Maintain the ISO14242 AssetClosure table alongside materialized paths.
+# After re-enabling, run services.rebuild_full_tree() to resync the table.
+# Rows loaded with ``loaddata`` are synced by ISO14242.signals.
+ISO14242_ASSET_CLOSURE = True